@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from layout import apply_custom_css, render_header, render_footer
 from database import init_db, get_patient_history, authenticate_user, update_user_theme, get_user_predictions, delete_user
 import logging
+from logging_setup import configure_once
+from metrics_utils import cached_history
 import os
 import json
 import base64
@@ -16,11 +18,7 @@ from io import BytesIO
 import sqlite3
 
 # Configure logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
-)
+configure_once()
 
 # Initialize encryption
 ENCRYPTION_KEY = os.environ.get("ENCRYPTION_KEY", Fernet.generate_key().decode())
@@ -558,6 +556,7 @@ if st.session_state.logged_in:
             if st.button("Confirm Account Deletion", key="confirm_delete"):
                 try:
                     delete_user(st.session_state.user_id)
+                    cached_history.clear()
                     st.session_state.logged_in = False
                     st.session_state.username = ""
                     st.session_state.user_id = None
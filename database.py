@@ -10,13 +10,10 @@ import shutil
 from argon2 import PasswordHasher
 import atexit
 import os
+from logging_setup import configure_once
 
 # Configure logging
-logging.basicConfig(
-    filename='database.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
-)
+configure_once()
 
 DB_PATH = "health_data.db"
 BACKUP_PATH = "health_data_backup.db"
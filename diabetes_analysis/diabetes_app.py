@@ -4,16 +4,13 @@ import numpy as np
 import joblib
 from datetime import datetime
 import logging
+from logging_setup import configure_once
 import os
 from database import init_db, save_patient_data, get_patient_history, save_prediction, get_user_predictions
 from layout import apply_custom_css, render_header, render_footer
 
 # Configure logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+configure_once()
 
 # Initialize database
 init_db()
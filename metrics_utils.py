@@ -0,0 +1,19 @@
+import json
+import os
+import streamlit as st
+from database import get_user_predictions
+
+# Model metrics are static between deployments; parse once instead of on every rerun.
+# Returns None when the metrics file has not been generated
+@st.cache_data(ttl=3600)
+def load_metrics(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+# Short-lived cache for the prediction history expanders, shared by every analysis page; callers clear it
+# whenever a prediction is saved or a user is deleted
+@st.cache_data(ttl=30)
+def cached_history(user_id, prediction_type):
+    return get_user_predictions(user_id, prediction_type=prediction_type)
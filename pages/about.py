@@ -3,15 +3,12 @@ from layout import apply_custom_css, render_header, render_footer
 from database import authenticate_user, update_user_theme
 from datetime import datetime, timedelta
 import logging
+from logging_setup import configure_once
 import os
 import base64
 
 # Configure logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+configure_once()
 
 # Set page configuration
 st.set_page_config(
@@ -3,6 +3,7 @@ from layout import apply_custom_css, render_header, render_footer
 from database import update_user_theme
 from datetime import datetime, timedelta
 import logging
+from logging_setup import configure_once
 import re
 import smtplib
 from email.mime.text import MIMEText
@@ -15,11 +16,7 @@ import sqlite3
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+configure_once()
 
 # Set page configuration
 st.set_page_config(
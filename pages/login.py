@@ -23,7 +23,7 @@ def apply_form_css(theme="light"):
         .form-container { max-width: 500px; margin: 2rem auto; padding: 2rem; border-radius: 10px; box-shadow: 0 4px 12px rgba(0, 0, 0, 0.08); }
         .form-input { width: 100%; padding: 0.75rem; margin-bottom: 1rem; border: 1px solid #ccc; border-radius: 10px; font-family: 'Inter', sans-serif; font-size: 1rem; transition: all 0.2s ease; }
         .form-input:focus { border-color: #0055ff; outline: none; box-shadow: 0 0 5px rgba(0, 85, 255, 0.5); }
-        .form-label { font-weight: 500; margin-bottom: 0.5rem; display: block; }
+        .stTextInput label { font-weight: 500; margin-bottom: 0.5rem; display: block; }
         .submit-button { background-color: #0055ff; color: #fff; padding: 0.7rem 1.5rem; border: none; border-radius: 10px; font-weight: 500; cursor: pointer; transition: all 0.2s ease; width: 100%; }
         .submit-button:hover { background-color: #0033cc; transform: translateY(-2px); }
         .submit-button:disabled { background-color: #cccccc; cursor: not-allowed; }
@@ -41,14 +41,14 @@ def apply_form_css(theme="light"):
     if theme == "dark":
         form_css += """
         .form-container { background-color: #2d3748; border-color: #4b5563; }
-        .form-label { color: #e5e7eb; }
+        .stTextInput label { color: #e5e7eb; }
         .form-input { background-color: #1f2a44; color: #e5e7eb; border-color: #4b5563; }
         .form-input:focus { border-color: #3b82f6; box-shadow: 0 0 5px rgba(59, 130, 246, 0.5); }
         """
     else:
         form_css += """
         .form-container { background-color: #fff; }
-        .form-label { color: #1f2a44; }
+        .stTextInput label { color: #1f2a44; }
         .form-input { background-color: #fff; color: #1f2a44; }
         """
     form_css += "</style>"
@@ -142,63 +142,59 @@ with col_main:
 
         # Login Tab
         with tab_login:
+            ss = st.session_state
             st.markdown('<div class="form-container tab-content" role="form" aria-label="Login Form">', unsafe_allow_html=True)
             with st.form("login_form", clear_on_submit=True):
-                st.markdown('<label class="form-label" for="login_username">Username</label>', unsafe_allow_html=True)
-                username = st.text_input("Username", placeholder="Your username", key="login_username", label_visibility="hidden")
+                username = st.text_input("Username", placeholder="Your username", key="login_username")
                 
-                st.markdown('<label class="form-label" for="login_password">Password</label>', unsafe_allow_html=True)
-                password = st.text_input("Password", type="password", placeholder="Your password", key="login_password", label_visibility="hidden")
+                password = st.text_input("Password", type="password", placeholder="Your password", key="login_password")
                 
-                submit_button = st.form_submit_button("Login", use_container_width=True, disabled=(st.session_state.login_attempts >= MAX_ATTEMPTS))
+                submit_button = st.form_submit_button("Login", use_container_width=True, disabled=(ss.login_attempts >= MAX_ATTEMPTS))
 
                 if submit_button:
                     st.markdown('<div class="spinner active" aria-label="Processing login"></div>', unsafe_allow_html=True)
                     time.sleep(1)  # Simulate processing
                     
-                    if st.session_state.login_attempts >= MAX_ATTEMPTS:
-                        st.error(f"Too many login attempts. Please wait {(ATTEMPT_WINDOW - (datetime.now() - st.session_state.last_attempt_time)).seconds // 60} minutes or use 'Forgot Password'.")
+                    if ss.login_attempts >= MAX_ATTEMPTS:
+                        st.error(f"Too many login attempts. Please wait {(ATTEMPT_WINDOW - (datetime.now() - ss.last_attempt_time)).seconds // 60} minutes or use 'Forgot Password'.")
                     elif not username.strip() or not password.strip():
                         st.error("Username and password are required.")
                     else:
                         try:
                             user = authenticate_user(username, password)
                             if user:
-                                st.session_state.logged_in = True
-                                st.session_state.username = username
-                                st.session_state.user_id = user[0]
-                                st.session_state.last_activity = datetime.now()
-                                st.session_state.login_attempts = 0
+                                ss.logged_in = True
+                                ss.username = username
+                                ss.user_id = user[0]
+                                ss.last_activity = datetime.now()
+                                ss.login_attempts = 0
                                 st.success(f"Welcome, {username}!")
-                                redirect_page = st.session_state.redirect_to
-                                st.session_state.redirect_to = "app.py"
+                                redirect_page = ss.redirect_to
+                                ss.redirect_to = "app.py"
                                 try:
                                     st.switch_page(redirect_page)
                                 except Exception:
                                     st.switch_page("app.py")
                             else:
-                                st.session_state.login_attempts += 1
-                                st.session_state.last_attempt_time = datetime.now()
-                                st.error(f"Invalid username or password. {MAX_ATTEMPTS - st.session_state.login_attempts} attempts remaining.")
+                                ss.login_attempts += 1
+                                ss.last_attempt_time = datetime.now()
+                                st.error(f"Invalid username or password. {MAX_ATTEMPTS - ss.login_attempts} attempts remaining.")
                         except Exception as e:
                             st.error(f"Login error: {e}")
             st.markdown('</div>', unsafe_allow_html=True)
 
         # Signup Tab
         with tab_signup:
+            ss = st.session_state
             st.markdown('<div class="form-container tab-content" role="form" aria-label="Sign Up Form">', unsafe_allow_html=True)
             with st.form("signup_form", clear_on_submit=True):
-                st.markdown('<label class="form-label" for="signup_username">Username</label>', unsafe_allow_html=True)
-                new_username = st.text_input("Username", placeholder="Choose a username (4+ chars)", key="signup_username", label_visibility="hidden")
+                new_username = st.text_input("Username", placeholder="Choose a username (4+ chars)", key="signup_username")
                 
-                st.markdown('<label class="form-label" for="signup_email">Email</label>', unsafe_allow_html=True)
-                new_email = st.text_input("Email", placeholder="Your email address", key="signup_email", label_visibility="hidden")
+                new_email = st.text_input("Email", placeholder="Your email address", key="signup_email")
                 
-                st.markdown('<label class="form-label" for="signup_password">Password</label>', unsafe_allow_html=True)
-                new_password = st.text_input("Password", type="password", placeholder="Create a password (8+ chars)", key="signup_password", label_visibility="hidden")
+                new_password = st.text_input("Password", type="password", placeholder="Create a password (8+ chars)", key="signup_password")
                 
-                st.markdown('<label class="form-label" for="signup_confirm">Confirm Password</label>', unsafe_allow_html=True)
-                confirm_password = st.text_input("Confirm Password", type="password", placeholder="Confirm your password", key="signup_confirm", label_visibility="hidden")
+                confirm_password = st.text_input("Confirm Password", type="password", placeholder="Confirm your password", key="signup_confirm")
                 
                 # Simulated CAPTCHA
                 captcha_checked = st.checkbox("I am not a robot", key="signup_captcha")
@@ -209,22 +205,23 @@ with col_main:
                     st.markdown('<div class="spinner active" aria-label="Processing signup"></div>', unsafe_allow_html=True)
                     time.sleep(1)  # Simulate processing
                     
-                    if not all([new_username, new_email, new_password, confirm_password]):
-                        st.error("All fields are required.")
-                    elif not re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", new_email):
-                        st.error("Please enter a valid email address.")
-                    elif not re.match(r"^(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$", new_password):
-                        st.error("Password must be at least 8 characters long, with 1 uppercase letter, 1 number, and 1 special character.")
-                    elif new_password != confirm_password:
-                        st.error("Passwords do not match.")
-                    elif len(new_username) < 4:
-                        st.error("Username must be at least 4 characters long.")
-                    elif not captcha_checked:
-                        st.error("Please verify you are not a robot.")
+                    # Ordered (predicate, message) checks; the first failing one is reported
+                    signup_checks = (
+                        (lambda: not (new_username and new_email and new_password and confirm_password), "All fields are required."),
+                        (lambda: not re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", new_email), "Please enter a valid email address."),
+                        (lambda: not re.match(r"^(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$", new_password), "Password must be at least 8 characters long, with 1 uppercase letter, 1 number, and 1 special character."),
+                        (lambda: new_password != confirm_password, "Passwords do not match."),
+                        (lambda: len(new_username) < 4, "Username must be at least 4 characters long."),
+                        (lambda: not captcha_checked, "Please verify you are not a robot."),
+                    )
+                    signup_error = next((message for failed, message in signup_checks if failed()), None)
+
+                    if signup_error:
+                        st.error(signup_error)
                     else:
                         try:
                             if register_user(new_username, new_password, new_email):
-                                st.session_state.last_activity = datetime.now()
+                                ss.last_activity = datetime.now()
                                 st.success("Account created successfully! Please log in.")
                             else:
                                 st.error("Username or email already exists.")
@@ -234,10 +231,10 @@ with col_main:
 
         # Forgot Password Tab
         with tab_forgot:
+            ss = st.session_state
             st.markdown('<div class="form-container tab-content" role="form" aria-label="Forgot Password Form">', unsafe_allow_html=True)
             with st.form("reset_form", clear_on_submit=True):
-                st.markdown('<label class="form-label" for="reset_email">Email</label>', unsafe_allow_html=True)
-                email = st.text_input("Email", placeholder="Your registered email", key="reset_email", label_visibility="hidden")
+                email = st.text_input("Email", placeholder="Your registered email", key="reset_email")
                 
                 # Simulated CAPTCHA
                 captcha_checked = st.checkbox("I am not a robot", key="reset_captcha")
@@ -259,7 +256,7 @@ with col_main:
                             user = get_user_by_email(email)
                             if user:
                                 token = create_reset_token(user[0])
-                                st.session_state.last_activity = datetime.now()
+                                ss.last_activity = datetime.now()
                                 st.success(f"Password reset link sent to {email}! Check your inbox.")
                                 st.info(f"Development mode: Use token '{token}' to reset your password. Contact {contact_config['admin_email']} for assistance.")
                             else:
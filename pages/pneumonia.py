@@ -8,7 +8,6 @@ st.set_page_config(
 )
 
 # Imports after set_page_config
-from xray_analysis.xray_app import run_pneumonia_app
 from layout import apply_custom_css, render_header, render_footer
 
 # Initialize session state
@@ -29,6 +28,8 @@ if not st.session_state.logged_in:
     st.session_state.redirect_to = "pages/pneumonia.py"
     st.markdown("<a href='/login' class='cta-button'>Log in</a>", unsafe_allow_html=True)
 else:
+    # Deferred so unauthenticated visitors never import TensorFlow
+    from xray_analysis.xray_app import run_pneumonia_app
     run_pneumonia_app()
 
 # Render footer
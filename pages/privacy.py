@@ -3,13 +3,10 @@ from layout import apply_custom_css, render_header, render_footer
 from database import update_user_theme
 from datetime import datetime, timedelta
 import logging
+from logging_setup import configure_once
 
 # Configure logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+configure_once()
 
 # Set page configuration
 st.set_page_config(
@@ -19,50 +16,53 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Single clock reading shared by the session bookkeeping below
+now = datetime.now()
+ss = st.session_state
+
 # Initialize session state
-if "theme" not in st.session_state:
-    st.session_state.theme = "light"
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-if "redirect_to" not in st.session_state:
-    st.session_state.redirect_to = "app.py"
-if "last_activity" not in st.session_state:
-    st.session_state.last_activity = datetime.now()
-if "page_transition" not in st.session_state:
-    st.session_state.page_transition = False
+if "theme" not in ss:
+    ss.theme = "light"
+if "logged_in" not in ss:
+    ss.logged_in = False
+if "redirect_to" not in ss:
+    ss.redirect_to = "app.py"
+if "last_activity" not in ss:
+    ss.last_activity = now
+if "page_transition" not in ss:
+    ss.page_transition = False
 
 # Session timeout (30 minutes)
 SESSION_TIMEOUT = timedelta(minutes=30)
-if st.session_state.logged_in and (datetime.now() - st.session_state.last_activity) > SESSION_TIMEOUT:
-    st.session_state.logged_in = False
-    st.session_state.username = ""
-    st.session_state.user_id = None
-    st.session_state.redirect_to = "app.py"
+if ss.logged_in and (now - ss.last_activity) > SESSION_TIMEOUT:
+    ss.logged_in = False
+    ss.username = ""
+    ss.user_id = None
+    ss.redirect_to = "app.py"
     st.warning("Session timed out. Please log in again.")
     logging.info("Session timed out for user")
 
 # Theme toggle with database sync
 def toggle_theme():
-    new_theme = "dark" if st.session_state.theme == "light" else "light"
-    st.session_state.theme = new_theme
-    if st.session_state.logged_in:
+    new_theme = "dark" if ss.theme == "light" else "light"
+    ss.theme = new_theme
+    if ss.logged_in:
         try:
-            update_user_theme(st.session_state.user_id, new_theme)
-            logging.info(f"Theme updated to {new_theme} for user_id {st.session_state.user_id}")
+            update_user_theme(ss.user_id, new_theme)
+            logging.info(f"Theme updated to {new_theme} for user_id {ss.user_id}")
         except Exception as e:
             logging.error(f"Failed to update theme in database: {e}")
-    apply_custom_css(st.session_state.theme)
 
 # Apply CSS and render header
 try:
-    apply_custom_css(st.session_state.theme)
+    apply_custom_css(ss.theme)
     render_header()
 except Exception as e:
     st.error(f"Error rendering header: {e}")
     logging.error(f"Header rendering failed: {e}")
 
 # Page transition animation
-if st.session_state.page_transition:
+if ss.page_transition:
     st.markdown("""
     <style>
         .page-transition {
@@ -74,7 +74,7 @@ if st.session_state.page_transition:
         }
     </style>
     """, unsafe_allow_html=True)
-    st.session_state.page_transition = False
+    ss.page_transition = False
 
 # Breadcrumbs
 def render_breadcrumbs():
@@ -107,9 +107,9 @@ with st.sidebar:
                     "Contact": "pages/contact.py",
                     "Login": "pages/login.py"
                 }
-                st.session_state.redirect_to = page_map[selection]
-                st.session_state.page_transition = True
-                if not st.session_state.logged_in and selection not in ["Home", "About", "Contact", "Privacy Policy"]:
+                ss.redirect_to = page_map[selection]
+                ss.page_transition = True
+                if not ss.logged_in and selection not in ["Home", "About", "Contact", "Privacy Policy"]:
                     st.switch_page("pages/login.py")
                 else:
                     st.switch_page(page_map[selection])
@@ -125,12 +125,12 @@ with st.sidebar:
         st.rerun()
 
 # Session timeout warning
-if st.session_state.logged_in:
-    time_left = SESSION_TIMEOUT - (datetime.now() - st.session_state.last_activity)
+if ss.logged_in:
+    time_left = SESSION_TIMEOUT - (now - ss.last_activity)
     if time_left < timedelta(minutes=5):
         st.warning(f"Session will expire in {int(time_left.total_seconds() // 60)} minutes. Interact to extend.")
         if st.button("Extend Session", key="extend_session"):
-            st.session_state.last_activity = datetime.now()
+            ss.last_activity = now
             st.rerun()
 
 # Privacy policy configuration
@@ -225,8 +225,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 if st.button("Contact Us", key="contact_cta", use_container_width=True):
     try:
-        st.session_state.redirect_to = "pages/contact.py"
-        st.session_state.page_transition = True
+        ss.redirect_to = "pages/contact.py"
+        ss.page_transition = True
         st.switch_page("pages/contact.py")
         logging.info("Navigated to Contact page from Privacy")
     except Exception as e:
@@ -235,8 +235,8 @@ if st.button("Contact Us", key="contact_cta", use_container_width=True):
 st.markdown("</div>", unsafe_allow_html=True)
 
 # Update last activity
-if st.session_state.logged_in:
-    st.session_state.last_activity = datetime.now()
+if ss.logged_in:
+    ss.last_activity = now
 
 # Render footer
 try:
@@ -1,73 +1,131 @@
 import streamlit as st
 import numpy as np
 import joblib
-import tensorflow as tf
 import librosa
-import pandas as pd
+import soundfile as sf
+from numba import njit
 from datetime import datetime
-import json
-import os
 import logging
+import hashlib
+from math import log10
+from io import BytesIO
+from logging_setup import configure_once
 from layout import apply_custom_css, render_header, render_footer
-from database import save_prediction, get_user_predictions
+from metrics_utils import load_metrics, cached_history
+from database import save_prediction
 
 # Configure logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+configure_once()
 
-# Cache model and scaler
+# Dense weights of the Parkinson's MLP, written by speech_model.py alongside parkinsons_model.keras
+WEIGHTS_PATH = "models/parkinsons_weights.npz"
+WEIGHT_NAMES = ("W1", "b1", "W2", "b2", "W3", "b3")
+
+# numba compile with an on-disk cache across restarts; on read-only deploys numba finds no writable cache
+# location and raises at decoration, so fall back to compiling in-process
+def jit_cached(func):
+    try:
+        return njit(cache=True)(func)
+    except RuntimeError as e:
+        logging.warning(f"numba cache unavailable for {func.__name__}, compiling without it: {e}")
+        return njit(func)
+
+# Build the 22-feature row in the scaler's training column order
+@jit_cached
+def assemble_features(centroid, bandwidth, rolloff, zcr, rms, flat):
+    out = np.zeros(22, dtype=np.float32)
+    out[0] = centroid            # MDVP:Fo(Hz)
+    out[1] = bandwidth           # MDVP:Fhi(Hz)
+    out[2] = rolloff             # MDVP:Flo(Hz)
+    out[3] = zcr                 # MDVP:Jitter(%)
+    out[4] = zcr                 # MDVP:Jitter(Abs), zero-crossing rate is already non-negative
+    out[5] = zcr / 2             # MDVP:RAP
+    out[6] = zcr / 3             # MDVP:PPQ
+    out[7] = zcr * 3             # Jitter:DDP
+    out[8] = rms                 # MDVP:Shimmer
+    out[9] = 20.0 * log10(rms)   # MDVP:Shimmer(dB)
+    out[10] = rms / 3            # Shimmer:APQ3
+    out[11] = rms / 5            # Shimmer:APQ5
+    out[12] = rms / 2            # MDVP:APQ
+    out[13] = rms * 3            # Shimmer:DDA
+    out[14] = flat               # NHR
+    out[15] = rms / flat         # HNR
+    # out[16:22]: RPDE, DFA, spread1, spread2, D2, PPE placeholders for advanced features
+    return out
+
+# Cache model weights and scaler
 @st.cache_resource
 def load_model_and_scaler():
     try:
-        model = tf.keras.models.load_model("models/parkinsons_model.keras")
+        with np.load(WEIGHTS_PATH) as weights:
+            params = tuple(weights[name].astype(np.float32) for name in WEIGHT_NAMES)
         scaler = joblib.load("models/parkinsons_scaler.pkl")
-        return model, scaler
-    except FileNotFoundError:
+        # Standardize with plain vector math at inference instead of scaler.transform
+        scaler_mean = scaler.mean_.astype(np.float32)
+        scaler_scale = scaler.scale_.astype(np.float32)
+        # Compile assemble_features for the float32 means extract_features passes, at startup, not on the first click
+        assemble_features(*[np.float32(1.0)] * 6)
+        return params, scaler_mean, scaler_scale
+    except OSError as e:
         st.error("Parkinson’s model or scaler not found.")
-        logging.error("Parkinson’s model or scaler file missing.")
+        logging.error(f"Parkinson’s model or scaler file could not be read: {e}")
         st.stop()
 
-model, scaler = load_model_and_scaler()
+params, scaler_mean, scaler_scale = load_model_and_scaler()
+
+# NumPy forward pass of the 22-128-64-1 MLP (dropout is a no-op at inference)
+def predict_proba(features_scaled):
+    W1, b1, W2, b2, W3, b3 = params
+    h1 = np.maximum(0, features_scaled @ W1 + b1)
+    h2 = np.maximum(0, h1 @ W2 + b2)
+    return 1 / (1 + np.exp(-(h2 @ W3 + b3)))
+
+TARGET_SR = 22050
 
 # Feature extraction with validation
 def extract_features(audio_file):
     try:
-        y, sr = librosa.load(audio_file, sr=None)
-        if len(y) < sr * 5:  # Require at least 5 seconds
+        # Check duration from the WAV header before paying for a full decode
+        info = sf.info(audio_file)
+        if info.frames < info.samplerate * 5:  # Require at least 5 seconds
             raise ValueError("Audio must be at least 5 seconds long")
-        features = {
-            "MDVP:Fo(Hz)": librosa.feature.spectral_centroid(y=y, sr=sr).mean(),
-            "MDVP:Fhi(Hz)": librosa.feature.spectral_bandwidth(y=y, sr=sr).mean(),
-            "MDVP:Flo(Hz)": librosa.feature.spectral_rolloff(y=y, sr=sr).mean(),
-            "MDVP:Jitter(%)": librosa.feature.zero_crossing_rate(y).mean(),
-            "MDVP:Jitter(Abs)": np.abs(librosa.feature.zero_crossing_rate(y)).mean(),
-            "MDVP:RAP": librosa.feature.zero_crossing_rate(y).mean() / 2,
-            "MDVP:PPQ": librosa.feature.zero_crossing_rate(y).mean() / 3,
-            "Jitter:DDP": librosa.feature.zero_crossing_rate(y).mean() * 3,
-            "MDVP:Shimmer": librosa.feature.rms(y=y).mean(),
-            "MDVP:Shimmer(dB)": 20 * np.log10(librosa.feature.rms(y=y).mean()),
-            "Shimmer:APQ3": librosa.feature.rms(y=y).mean() / 3,
-            "Shimmer:APQ5": librosa.feature.rms(y=y).mean() / 5,
-            "MDVP:APQ": librosa.feature.rms(y=y).mean() / 2,
-            "Shimmer:DDA": librosa.feature.rms(y=y).mean() * 3,
-            "NHR": librosa.feature.spectral_flatness(y=y).mean(),
-            "HNR": librosa.feature.rms(y=y).mean() / librosa.feature.spectral_flatness(y=y).mean(),
-            "RPDE": 0.0,  # Placeholder for advanced features
-            "DFA": 0.0,
-            "spread1": 0.0,
-            "spread2": 0.0,
-            "D2": 0.0,
-            "PPE": 0.0
-        }
-        return pd.DataFrame([features])
+        audio_file.seek(0)
+        # Decode the WAV directly to float32 and downmix to mono
+        y, sr = sf.read(audio_file, dtype="float32")
+        if y.ndim > 1:
+            y = y.mean(axis=1)
+        # 22.05 kHz is ample for voice features and halves the work on 44.1/48 kHz uploads
+        if sr != TARGET_SR:
+            y = librosa.resample(y, orig_sr=sr, target_sr=TARGET_SR)
+            sr = TARGET_SR
+        # One magnitude STFT shared by all spectral features
+        S = np.abs(librosa.stft(y, n_fft=2048, hop_length=512))
+        # Compute each framed feature once and derive the variants from its mean
+        zcr = librosa.feature.zero_crossing_rate(y).mean()
+        rms = librosa.feature.rms(y=y).mean()
+        # Spectral features share the STFT frames; reduce them in a single mean over one contiguous block
+        centroid, bandwidth, rolloff, flat = np.concatenate([
+            librosa.feature.spectral_centroid(S=S, sr=sr),
+            librosa.feature.spectral_bandwidth(S=S, sr=sr),
+            librosa.feature.spectral_rolloff(S=S, sr=sr),
+            librosa.feature.spectral_flatness(S=S)
+        ], axis=0).mean(axis=1)
+        return assemble_features(centroid, bandwidth, rolloff, zcr, rms, flat)[None, :]
     except Exception as e:
         st.error(f"Error processing audio: {e}")
         logging.error(f"Audio processing error: {e}")
         return None
 
+# Cache features and predictions by audio content hash so re-submitting the same file skips extraction
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_features(audio_hash, _audio_bytes):
+    return extract_features(BytesIO(_audio_bytes))
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_prediction(audio_hash, _features):
+    features_scaled = (_features - scaler_mean) / scaler_scale
+    return float(predict_proba(features_scaled)[0, 0])
+
 # Initialize session state
 def initialize_session_state():
     defaults = {
@@ -129,10 +187,9 @@ def run_speech_app():
         )
 
         # Model metrics
-        if os.path.exists("static/parkinsons_metrics.json"):
-            try:
-                with open("static/parkinsons_metrics.json") as f:
-                    metrics = json.load(f)
+        try:
+            metrics = load_metrics("static/parkinsons_metrics.json")
+            if metrics is not None:
                 st.markdown(
                     f"""
                     <div class="card" style='text-align: center; margin-bottom: 2rem;'>
@@ -142,9 +199,9 @@ def run_speech_app():
                     """,
                     unsafe_allow_html=True
                 )
-            except Exception as e:
-                st.warning("Unable to load model metrics.")
-                logging.error(f"Error loading parkinsons_metrics.json: {e}")
+        except Exception as e:
+            st.warning("Unable to load model metrics.")
+            logging.error(f"Error loading parkinsons_metrics.json: {e}")
 
         # Input form
         with st.form("speech_form"):
@@ -182,11 +239,12 @@ def run_speech_app():
             else:
                 st.audio(uploaded_file, format="audio/wav")
                 with st.spinner("Analyzing audio..."):
-                    features = extract_features(uploaded_file)
+                    audio_bytes = uploaded_file.getvalue()
+                    audio_hash = hashlib.blake2b(audio_bytes).hexdigest()
+                    features = cached_features(audio_hash, audio_bytes)
                     if features is not None:
                         try:
-                            features_scaled = scaler.transform(features)
-                            prediction = model.predict(features_scaled, verbose=0)[0][0]
+                            prediction = cached_prediction(audio_hash, features)
                             probability = prediction * 100
                             outcome = "Parkinson’s Detected" if prediction > 0.5 else "No Parkinson’s"
                             confidence = probability if prediction > 0.5 else (1 - prediction) * 100
@@ -201,6 +259,7 @@ def run_speech_app():
                                     outcome=outcome,
                                     timestamp=timestamp
                                 )
+                                cached_history.clear()
                                 logging.info(f"Saved Parkinson’s prediction for user_id {st.session_state.user_id}")
                             except Exception as e:
                                 st.warning("Failed to save prediction history.")
@@ -258,7 +317,7 @@ def run_speech_app():
         if st.session_state.logged_in and st.session_state.user_id:
             with st.expander("Recent Predictions", expanded=False):
                 try:
-                    history = get_user_predictions(st.session_state.user_id, prediction_type="Parkinson’s")
+                    history = cached_history(st.session_state.user_id, "Parkinson’s")
                     if not history.empty:
                         st.dataframe(
                             history[["timestamp", "outcome", "probability"]].sort_values(by="timestamp", ascending=False),
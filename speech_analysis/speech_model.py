@@ -48,6 +48,11 @@ model.fit(X_train_scaled, y_train, epochs=50, batch_size=32, validation_split=0.
 model.save("models/parkinsons_model.keras")
 joblib.dump(scaler, "models/parkinsons_scaler.pkl")
 
+# Export Dense weights for the app's NumPy forward pass (no TensorFlow at serve time)
+dense_layers = [layer for layer in model.layers if isinstance(layer, Dense)]
+W1, b1, W2, b2, W3, b3 = [array for layer in dense_layers for array in layer.get_weights()]
+np.savez("models/parkinsons_weights.npz", W1=W1, b1=b1, W2=W2, b2=b2, W3=W3, b3=b3)
+
 # Evaluate model
 test_loss, test_accuracy = model.evaluate(X_test_scaled, y_test)
 print(f"Test Accuracy: {test_accuracy:.2%}")
\ No newline at end of file
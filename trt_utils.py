@@ -0,0 +1,62 @@
+import glob
+import hashlib
+import logging
+import os
+import tensorflow as tf
+
+TRT_MODEL_DIR = "models/trt"
+
+# Short content hash of a model file; derived artifacts (TF-TRT engines, TF-Lite files) are tagged with it
+# so one built from an older model is never served with the current model's preprocessing
+def source_fingerprint(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+def trt_model_path(name, source_path):
+    return os.path.join(TRT_MODEL_DIR, f"{name}_{source_fingerprint(source_path)}_trt_fp16")
+
+# Export a Keras model as a SavedModel and convert it to an FP16 TF-TRT engine, replacing any existing one.
+# The converter is created first: it raises right away on TensorFlow builds without TF-TRT (the default for
+# CUDA builds since 2.18), before the export spends seconds writing a SavedModel that can't be converted
+def build_trt_model(model, name, input_shape, source_path):
+    saved_model_dir = os.path.join(TRT_MODEL_DIR, f"{name}_savedmodel")
+    trt_model_dir = trt_model_path(name, source_path)
+    converter = tf.experimental.tensorrt.Converter(
+        input_saved_model_dir=saved_model_dir,
+        precision_mode="FP16"
+    )
+    model.export(saved_model_dir)
+    converter.convert()
+
+    def input_fn():
+        yield (tf.zeros(input_shape, dtype=tf.float32),)
+
+    converter.build(input_fn=input_fn)
+    converter.save(trt_model_dir)
+    logging.info(f"Built TensorRT engine for {name} at {trt_model_dir}")
+    return trt_model_dir
+
+# Load the FP16 TF-TRT engine that build_trt_model() produced at training time for the Keras model saved at
+# source_path. Serving never builds engines (no exports or writes to models/ on a cold start). Opt-in: without a
+# GPU and an engine directory for name, returns None before hashing the model file. Otherwise returns a
+# predict(batch) -> np.ndarray callable, or None when the engine is stale or can't be loaded
+def load_trt_model(name, source_path):
+    if not tf.config.list_physical_devices("GPU") or not glob.glob(os.path.join(TRT_MODEL_DIR, f"{name}_*_trt_fp16")):
+        return None
+    try:
+        trt_model_dir = trt_model_path(name, source_path)
+        if not os.path.exists(trt_model_dir):
+            logging.warning(f"No TensorRT engine for the current {source_path}; rebuild it by retraining")
+            return None
+
+        serving_fn = tf.saved_model.load(trt_model_dir).signatures["serving_default"]
+        input_name = next(iter(serving_fn.structured_input_signature[1]))
+
+        def predict(batch):
+            outputs = serving_fn(**{input_name: tf.constant(batch, dtype=tf.float32)})
+            return next(iter(outputs.values())).numpy()
+
+        return predict
+    except Exception as e:
+        logging.warning(f"TensorRT unavailable for {name}, falling back to Keras: {e}")
+        return None
@@ -2,69 +2,110 @@ import streamlit as st
 import tensorflow as tf
 import numpy as np
 import pandas as pd
-from PIL import Image
 from datetime import datetime
-import json
 import os
 import logging
-from io import BytesIO
-import base64
-from database import save_prediction, get_user_predictions
+import threading
+from logging_setup import configure_once
+from database import save_prediction
 from layout import apply_custom_css, render_header, render_footer
+from metrics_utils import load_metrics, cached_history
+from trt_utils import load_trt_model
+from xray_analysis.xray_quantize import with_input_rescaling, convert_dtype_policy, tflite_matches_source, run_tflite
+from xray_analysis.xray_prepare_data import decode_resized
 
 # Configure logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+configure_once()
+
+GPU_AVAILABLE = bool(tf.config.list_physical_devices("GPU"))
+MODEL_PATH = "models/pneumonia_model.keras"
 
 # Cache model
 @st.cache_resource
 def load_model():
     try:
-        return tf.keras.models.load_model("models/pneumonia_model.keras")
+        model = with_input_rescaling(tf.keras.models.load_model(MODEL_PATH))
+        trt_predict = load_trt_model("pneumonia", MODEL_PATH)
+        # TF-TRT already runs in FP16; otherwise use mixed precision on GPU (no gain on CPU)
+        if trt_predict is None and GPU_AVAILABLE:
+            model = convert_dtype_policy(model, "mixed_float16")
+        elif not GPU_AVAILABLE and any(layer.dtype_policy.name != "float32" for layer in model.layers):
+            # Models trained under mixed precision compute in FP16, which is slow on CPU
+            model = convert_dtype_policy(model, "float32")
+        # Warm up with a dummy batch so cuDNN autotuning happens at startup, not on the first click
+        warmup_batch = np.zeros((1, 150, 150, 3), dtype=np.float32)
+        if trt_predict is not None:
+            trt_predict(warmup_batch)
+        else:
+            model(tf.constant(warmup_batch), training=False)
+        return model, trt_predict
     except Exception as e:
         st.error(f"Error loading model: {e}")
         logging.error(f"Pneumonia model failed to load: {e}")
         st.stop()
 
-model = load_model()
+TFLITE_MODEL_PATH = "models/pneumonia_int8.tflite"
+tflite_lock = threading.Lock()  # Interpreter is shared across sessions but not thread-safe
+
+# INT8 TF-Lite interpreter for CPU-only hosts; None on GPU or when the quantized model has not been exported.
+# The FlatBuffer and its .source sidecar are not shipped in the repository: they are generated at deploy time by
+# training or `python -m xray_analysis.xray_quantize`, which need data/chest_xray for calibration and the accuracy
+# check. Without them every start loads the Keras model
+@st.cache_resource
+def load_tflite_interpreter():
+    if GPU_AVAILABLE or not os.path.exists(TFLITE_MODEL_PATH):
+        return None
+    # A FlatBuffer exported from another model (e.g. one expecting [0, 1] input) would silently mispredict
+    if not tflite_matches_source(TFLITE_MODEL_PATH, MODEL_PATH):
+        logging.warning(f"Ignoring {TFLITE_MODEL_PATH}: not exported from the current {MODEL_PATH}")
+        return None
+    try:
+        interpreter = tf.lite.Interpreter(model_path=TFLITE_MODEL_PATH, num_threads=os.cpu_count())
+        interpreter.allocate_tensors()
+        return interpreter
+    except Exception as e:
+        logging.error(f"Pneumonia TF-Lite model failed to load: {e}")
+        return None
+
+interpreter = load_tflite_interpreter()
+
+# CPU hosts serving the TF-Lite FlatBuffer skip rebuilding the Keras graph at startup
+if interpreter is None:
+    model, trt_predict = load_model()
+else:
+    model, trt_predict = None, None
 
-# Image preprocessing
-def preprocess_image(image):
+# Image preprocessing: the same decode and resize as training, on every host, so a scan gets the same input
+# tensor (and diagnosis) whether it is served on CPU or GPU
+def preprocess_image(image_bytes):
     try:
-        if image.mode not in ("RGB", "L"):
-            image = image.convert("RGB")
-        image = image.resize((150, 150))
-        image_array = np.array(image) / 255.0
-        if image_array.shape[-1] != 3:
-            image_array = np.stack([image_array] * 3, axis=-1)
-        return np.expand_dims(image_array, axis=0)
+        # Raw 0-255 pixels; the model rescales internally
+        return tf.cast(decode_resized(image_bytes), tf.float32)[None, ...].numpy()
     except Exception as e:
         st.error(f"Error processing image: {e}")
         logging.error(f"Image preprocessing failed: {e}")
         return None
 
 # Prediction function
-def predict_pneumonia(image):
-    processed_image = preprocess_image(image)
+def predict_pneumonia(image_bytes):
+    processed_image = preprocess_image(image_bytes)
     if processed_image is None:
         return None
     try:
-        probability = float(model.predict(processed_image, verbose=0)[0][0] * 100)
+        if trt_predict is not None:
+            output = trt_predict(processed_image)
+        elif interpreter is not None:
+            with tflite_lock:
+                output = run_tflite(interpreter, processed_image)
+        else:
+            output = model(processed_image, training=False).numpy()
+        probability = float(output[0][0] * 100)
         return probability
     except Exception as e:
         st.error(f"Error during prediction: {e}")
         logging.error(f"Prediction error: {e}")
         return None
 
-# Encode image to base64
-def encode_image(image):
-    buffered = BytesIO()
-    image.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode('utf-8')
-
 # Initialize session state
 def initialize_session_state():
     defaults = {
@@ -94,6 +135,16 @@ def run_pneumonia_app():
         st.error(f"Error applying CSS: {e}")
         logging.error(f"CSS application failed: {e}")
 
+    # Check authentication
+    if not st.session_state.logged_in:
+        st.warning("Please log in to use the Pneumonia Detection service.")
+        st.session_state.redirect_to = "pages/pneumonia.py"
+        if st.button("Log in", key="login_button", use_container_width=True):
+            st.session_state.page_transition = True
+            st.switch_page("pages/login.py")
+        logging.info("Unauthenticated access attempt to Pneumonia Detection")
+        return
+
     # Render header
     if not st.session_state.header_rendered:
         try:
@@ -115,21 +166,10 @@ def run_pneumonia_app():
             unsafe_allow_html=True
         )
 
-        # Check authentication
-        if not st.session_state.logged_in:
-            st.warning("Please log in to use the Pneumonia Detection service.")
-            st.session_state.redirect_to = "pages/pneumonia.py"
-            if st.button("Log in", key="login_button", use_container_width=True):
-                st.session_state.page_transition = True
-                st.switch_page("pages/login.py")
-            logging.info("Unauthenticated access attempt to Pneumonia Detection")
-            return
-
         # Model metrics
-        if os.path.exists("static/pneumonia_metrics.json"):
-            try:
-                with open("static/pneumonia_metrics.json") as f:
-                    metrics = json.load(f)
+        try:
+            metrics = load_metrics("static/pneumonia_metrics.json")
+            if metrics is not None:
                 st.markdown(
                     f"""
                     <div class="card" style='text-align: center; margin-bottom: 2rem;'>
@@ -139,9 +179,9 @@ def run_pneumonia_app():
                     """,
                     unsafe_allow_html=True
                 )
-            except Exception as e:
-                st.warning("Unable to load model metrics.")
-                logging.error(f"Error loading pneumonia_metrics.json: {e}")
+        except Exception as e:
+            st.warning("Unable to load model metrics.")
+            logging.error(f"Error loading pneumonia_metrics.json: {e}")
 
         # Input form
         with st.form("pneumonia_form"):
@@ -178,19 +218,11 @@ def run_pneumonia_app():
                 logging.warning("No X-ray image uploaded")
                 return
 
-            image = Image.open(uploaded_file)
-            st.markdown(
-                f"""
-                <div class="card" style='margin: 1rem 0;'>
-                    <img src="data:image/png;base64,{encode_image(image)}" alt="Uploaded X-ray" style='width: 100%; border-radius: 8px;'>
-                    <p style='text-align: center; font-style: italic;'>Uploaded X-ray</p>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+            # Serve the uploaded bytes as-is instead of re-encoding the full-resolution scan on the server
+            st.image(uploaded_file.getvalue(), caption="Uploaded X-ray", use_container_width=True)
 
             with st.spinner("Analyzing X-ray..."):
-                probability = predict_pneumonia(image)
+                probability = predict_pneumonia(uploaded_file.getvalue())
                 if probability is not None:
                     outcome = "Pneumonia Detected" if probability > 50 else "No Pneumonia"
                     confidence = probability if probability > 50 else (100 - probability)
@@ -205,6 +237,7 @@ def run_pneumonia_app():
                             outcome=outcome,
                             timestamp=timestamp
                         )
+                        cached_history.clear()
                         logging.info(f"Saved Pneumonia prediction for user_id {st.session_state.user_id}")
                     except Exception as e:
                         st.warning("Failed to save prediction history.")
@@ -259,7 +292,7 @@ def run_pneumonia_app():
         if st.session_state.logged_in and st.session_state.user_id:
             with st.expander("Recent Predictions", expanded=False):
                 try:
-                    history = get_user_predictions(st.session_state.user_id, prediction_type="Pneumonia")
+                    history = cached_history(st.session_state.user_id, "Pneumonia")
                     if not history.empty:
                         # Ensure probability is numeric
                         history['probability'] = pd.to_numeric(history['probability'], errors='coerce')
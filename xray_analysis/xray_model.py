@@ -1,50 +1,217 @@
+# Run from the repository root: python -m xray_analysis.xray_model
+import os
+
+# cuDNN autotuning (TF 2.x default) is read when TensorFlow loads; state it explicitly unless the
+# environment already sets it
+os.environ.setdefault("TF_CUDNN_USE_AUTOTUNE", "1")
+
 import tensorflow as tf
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
+from tensorflow.keras import mixed_precision
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
-import os
+from tensorflow.keras.layers import Rescaling, Conv2D, SeparableConv2D, MaxPooling2D, GlobalAveragePooling2D, Dense, Dropout, RandomFlip, RandomRotation, RandomZoom, RandomTranslation
+import math
+from xray_analysis.xray_quantize import export_int8_tflite, approve_int8_tflite, NUM_CALIBRATION_IMAGES
+from xray_analysis.xray_prepare_data import decode_resized
+from trt_utils import build_trt_model
+
+# Allocate GPU memory on demand instead of grabbing it all at the first op, leaving room for the app's
+# inference engines; XRAY_GPU_MEMORY_LIMIT_MB sets a hard cap instead. Must run before the GPUs initialize
+GPU_MEMORY_LIMIT_MB = os.environ.get("XRAY_GPU_MEMORY_LIMIT_MB")
+for gpu in tf.config.list_physical_devices('GPU'):
+    if GPU_MEMORY_LIMIT_MB:
+        tf.config.set_logical_device_configuration(gpu, [tf.config.LogicalDeviceConfiguration(memory_limit=int(GPU_MEMORY_LIMIT_MB))])
+    else:
+        tf.config.experimental.set_memory_growth(gpu, True)
+
+# Mixed precision: 16-bit compute on Tensor Cores with FP32 master weights.
+# bfloat16 on Ampere+ GPUs keeps FP32's exponent range, so no loss scaling is needed there
+def prefers_bfloat16():
+    gpus = tf.config.list_physical_devices('GPU')
+    return bool(gpus) and all(tf.config.experimental.get_device_details(gpu).get('compute_capability', (0, 0)) >= (8, 0) for gpu in gpus)
+
+USE_BFLOAT16 = prefers_bfloat16()
+mixed_precision.set_global_policy('mixed_bfloat16' if USE_BFLOAT16 else 'mixed_float16')
+
+# TF32 for ops left in FP32 on Ampere+ (TF 2.x default, pinned explicitly; this switch, not a cuDNN
+# environment variable, is what controls FP32 Tensor Core math in TF 2.x)
+tf.config.experimental.enable_tensor_float_32_execution(True)
 
-# Paths
-train_dir = "data/chest_xray/train"
-val_dir = "data/chest_xray/val"
-test_dir = "data/chest_xray/test"
+# Paths (uses the TFRecord shards or 150x150 copies from xray_prepare_data.py when present, so epochs skip
+# full-size decodes)
+tfrecord_root = "data/tfr"
+USE_TFRECORDS = os.path.isdir(tfrecord_root)
+data_root = "data/chest_xray_150" if os.path.isdir("data/chest_xray_150") else "data/chest_xray"
+
+# Data-parallel training across all local GPUs (gradients all-reduced via NCCL)
+strategy = tf.distribute.MirroredStrategy()
 
 # Image parameters
 IMG_HEIGHT, IMG_WIDTH = 150, 150
-BATCH_SIZE = 32
-
-# Data generators
-train_datagen = ImageDataGenerator(rescale=1./255, rotation_range=20, zoom_range=0.15, width_shift_range=0.2, height_shift_range=0.2, shear_range=0.15, horizontal_flip=True)
-val_datagen = ImageDataGenerator(rescale=1./255)
-
-train_generator = train_datagen.flow_from_directory(train_dir, target_size=(IMG_HEIGHT, IMG_WIDTH), batch_size=BATCH_SIZE, class_mode='binary')
-val_generator = val_datagen.flow_from_directory(val_dir, target_size=(IMG_HEIGHT, IMG_WIDTH), batch_size=BATCH_SIZE, class_mode='binary')
-
-# Build CNN model
-model = Sequential([
-    Conv2D(32, (3, 3), activation='relu', input_shape=(IMG_HEIGHT, IMG_WIDTH, 3)),
-    MaxPooling2D(2, 2),
-    Conv2D(64, (3, 3), activation='relu'),
-    MaxPooling2D(2, 2),
-    Conv2D(128, (3, 3), activation='relu'),
-    MaxPooling2D(2, 2),
-    Flatten(),
-    Dense(128, activation='relu'),
-    Dropout(0.5),
-    Dense(1, activation='sigmoid')
-])
-
-# Compile model
-model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+BATCH_SIZE_PER_REPLICA = 128
+BATCH_SIZE = BATCH_SIZE_PER_REPLICA * strategy.num_replicas_in_sync
+EPOCHS = 10
+EVAL_BATCH_SIZE = 256  # No gradients or augmentation at eval time, so larger batches fit
+
+# Learning rate scaled linearly with batch size (from 1e-3 at 32), cosine-decayed per epoch
+BASE_LR = 1e-3 * (BATCH_SIZE / 32)
+
+def cosine_decay(epoch):
+    return BASE_LR * 0.5 * (1 + math.cos(math.pi * epoch / EPOCHS))
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+# Decode one image to uint8; its binary label is the index of the class folder it was listed from
+def decode_example(path, label):
+    return decode_resized(tf.io.read_file(path)), label[None]
+
+# Parse one TFRecord example holding a pre-resized uint8 image and its integer label
+def parse_example(record):
+    features = tf.io.parse_single_example(record, {
+        "image": tf.io.FixedLenFeature([], tf.string),
+        "label": tf.io.FixedLenFeature([], tf.int64)
+    })
+    image = tf.reshape(tf.io.decode_raw(features["image"], tf.uint8), [IMG_HEIGHT, IMG_WIDTH, 3])
+    return image, tf.cast(features["label"], tf.float32)[None]
+
+# tf.data pipelines: stream TFRecord shards with large sequential reads, or list per-class files and decode
+# them across all cores; then batch and prefetch ahead of the GPU
+def load_dataset(split, shuffle=True, batch_size=BATCH_SIZE):
+    if USE_TFRECORDS:
+        shards = tf.data.Dataset.list_files(os.path.join(tfrecord_root, split, "*.tfrecord"), shuffle=shuffle)
+        records = shards.interleave(tf.data.TFRecordDataset, cycle_length=8, num_parallel_calls=AUTOTUNE, deterministic=not shuffle)
+        # Shards are pre-shuffled with a fixed seed, so a small buffer (about 68MB of raw images) suffices
+        if shuffle:
+            records = records.shuffle(1000, reshuffle_each_iteration=True)
+        return records.map(parse_example, num_parallel_calls=AUTOTUNE).batch(batch_size)
+
+    # Class folders in label order (NORMAL -> 0, PNEUMONIA -> 1); each class glob is paired with its label so
+    # nothing depends on parsing paths (separators differ on Windows)
+    class_names = sorted(entry.name for entry in os.scandir(os.path.join(data_root, "train")) if entry.is_dir())
+    class_patterns = [os.path.join(data_root, split, class_name, "*.jpeg") for class_name in class_names]
+    class_labels = [float(label) for label in range(len(class_names))]
+    files = tf.data.Dataset.from_tensor_slices((class_patterns, class_labels)).interleave(
+        lambda pattern, label: tf.data.Dataset.list_files(pattern, shuffle=shuffle).map(lambda path: (path, label)),
+        cycle_length=os.cpu_count(),
+        num_parallel_calls=AUTOTUNE,
+        deterministic=not shuffle
+    )
+    if shuffle:
+        files = files.shuffle(10000, reshuffle_each_iteration=True)
+    return files.map(decode_example, num_parallel_calls=AUTOTUNE).batch(batch_size)
+
+# Batches stay uint8 (1 byte/pixel to the GPU); augmentation and the model's Rescaling layer run on device
+train_ds = load_dataset("train").prefetch(AUTOTUNE)
+# Validation/test are deterministic, so decode once and cache the tensors (pass a path to cache() to spill to disk)
+val_ds = load_dataset("val", shuffle=False).cache().prefetch(AUTOTUNE)
+
+# Fits `network` on batches augmented on the GPU. The augmentation layers' affine warps have no XLA kernel, so
+# they run as regular GPU ops in train_step and only the forward/backward pass is compiled with XLA. Only the
+# inner network is saved, so the .keras file loads without this class
+class AugmentedTrainer(tf.keras.Model):
+    def __init__(self, network, augmentation):
+        super().__init__()
+        self.network = network
+        self.augmentation = augmentation
+        self.compute_gradients = tf.function(self._compute_gradients, jit_compile=True)
+
+    def call(self, inputs, training=False):
+        return self.network(inputs, training=training)
+
+    def _compute_gradients(self, x, y):
+        with tf.GradientTape() as tape:
+            y_pred = self(x, training=True)
+            loss = self.compute_loss(x=x, y=y, y_pred=y_pred)
+            scaled_loss = self.optimizer.scale_loss(loss)  # No-op unless wrapped in a LossScaleOptimizer
+        return tape.gradient(scaled_loss, self.trainable_variables), y_pred, loss
+
+    def train_step(self, data):
+        x, y = data
+        x = self.augmentation(x, training=True)
+        gradients, y_pred, loss = self.compute_gradients(x, y)
+        self.optimizer.apply(gradients, self.trainable_variables)
+        for metric in self.metrics:
+            if metric.name == "loss":
+                metric.update_state(loss)
+            else:
+                metric.update_state(y, y_pred)
+        return {metric.name: metric.result() for metric in self.metrics}
+
+# Adam with each variable's update (both moments, bias correction and the weight step) compiled as one XLA
+# kernel instead of a chain of memory-bound elementwise ops, like the jit_compile=True optimizers of TF 2.11-2.15.
+# It runs per variable after the cross-replica gradient all-reduce; the index keeps one trace per variable
+class FusedAdam(tf.keras.optimizers.Adam):
+    def update_step(self, gradient, variable, learning_rate):
+        self._xla_update_step(gradient, variable, learning_rate, self._get_variable_index(variable))
+
+    @tf.function(jit_compile=True, autograph=False)
+    def _xla_update_step(self, gradient, variable, learning_rate, variable_index):
+        tf.keras.optimizers.Adam.update_step(self, gradient, variable, learning_rate)
+
+# Build and compile the CNN under the strategy so its variables are mirrored on every replica
+with strategy.scope():
+    # Augmentation, applied only by the trainer (shear has no preprocessing-layer equivalent and is dropped)
+    augmentation = Sequential([
+        RandomFlip('horizontal'),
+        RandomRotation(20 / 360),
+        RandomZoom(0.15),
+        RandomTranslation(0.2, 0.2)
+    ])
+
+    model = Sequential([
+        # Rescale raw pixels on the GPU, where XLA can fuse it into the first conv's input cast
+        Rescaling(1. / 255, input_shape=(IMG_HEIGHT, IMG_WIDTH, 3)),
+        # 1x1 expansion from 3 to 8 channels so the first 3x3 conv gets Tensor-Core-aligned FP16 input
+        Conv2D(8, (1, 1), padding='same'),
+        SeparableConv2D(32, (3, 3), activation='relu', padding='same'),
+        MaxPooling2D(2, 2),
+        SeparableConv2D(64, (3, 3), activation='relu', padding='same'),
+        MaxPooling2D(2, 2),
+        SeparableConv2D(128, (3, 3), activation='relu', padding='same'),
+        MaxPooling2D(2, 2),
+        GlobalAveragePooling2D(),  # 128 features into the head instead of the flattened feature map
+        Dense(128, activation='relu'),
+        Dropout(0.5),
+        Dense(1, activation='sigmoid', dtype='float32')  # Keep the sigmoid and loss in FP32
+    ])
+
+    # Compile model, with loss scaling to avoid FP16 gradient underflow (not needed for bfloat16)
+    optimizer = FusedAdam(learning_rate=BASE_LR)
+    if not USE_BFLOAT16:
+        optimizer = mixed_precision.LossScaleOptimizer(optimizer)
+    # jit_compile stays off for the outer step, which holds the warps; the trainer compiles the forward/backward
+    # pass itself, letting XLA fuse the pointwise ops after each Conv2D (static 150x150x3 input)
+    trainer = AugmentedTrainer(model, augmentation)
+    trainer.compile(optimizer=optimizer, loss='binary_crossentropy', metrics=['accuracy'], jit_compile=False)
 
 # Train model
-history = model.fit(train_generator, epochs=10, validation_data=val_generator)
+lr_schedule = tf.keras.callbacks.LearningRateScheduler(cosine_decay)
+history = trainer.fit(train_ds, epochs=EPOCHS, validation_data=val_ds, callbacks=[lr_schedule])
 
 # Save model in Keras format
-model.save("models/pneumonia_model.keras")
+model_path = "models/pneumonia_model.keras"
+model.save(model_path)
 
 # Evaluate model
-test_datagen = ImageDataGenerator(rescale=1./255)
-test_generator = test_datagen.flow_from_directory(test_dir, target_size=(IMG_HEIGHT, IMG_WIDTH), batch_size=BATCH_SIZE, class_mode='binary')
-test_loss, test_accuracy = model.evaluate(test_generator)
-print(f"Test Accuracy: {test_accuracy:.2%}")
\ No newline at end of file
+test_ds = load_dataset("test", shuffle=False, batch_size=EVAL_BATCH_SIZE).cache().prefetch(AUTOTUNE)
+test_loss, test_accuracy = trainer.evaluate(test_ds)
+print(f"Test Accuracy: {test_accuracy:.2%}")
+
+# INT8 TF-Lite export for CPU serving, calibrated on a shuffled sample of training images (the validation split is
+# tiny); takes uint8 input. The app only serves it once it is measured within tolerance of the Keras accuracy
+def representative_images():
+    for image, _ in load_dataset("train", batch_size=1).take(NUM_CALIBRATION_IMAGES):
+        yield tf.cast(image, tf.float32)
+
+tflite_path = "models/pneumonia_int8.tflite"
+try:
+    export_int8_tflite(model, representative_images, tflite_path, inference_input_type=tf.uint8)
+    approve_int8_tflite(tflite_path, model_path, test_ds, test_accuracy)
+except Exception as e:
+    print(f"Skipping TF-Lite export: {e}")
+
+# Rebuild the FP16 TF-TRT engine the app serves on GPU, so it never runs a stale engine for an old model
+if tf.config.list_physical_devices('GPU'):
+    try:
+        build_trt_model(model, "pneumonia", (1, IMG_HEIGHT, IMG_WIDTH, 3), model_path)
+    except Exception as e:
+        print(f"Skipping TensorRT export: {e}")
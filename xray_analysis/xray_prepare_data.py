@@ -0,0 +1,78 @@
+# Run once from the repository root: python -m xray_analysis.xray_prepare_data
+import tensorflow as tf
+import os
+import random
+
+# Paths
+source_root = "data/chest_xray"
+resized_root = "data/chest_xray_150"
+tfrecord_root = "data/tfr"
+SPLITS = ("train", "val", "test")
+IMAGE_EXTENSIONS = (".jpeg", ".jpg", ".png")
+
+# Image parameters
+IMG_HEIGHT, IMG_WIDTH = 150, 150
+SHARD_BYTES = 100 * 1024 * 1024  # ~100MB TFRecord shards
+
+# Decode encoded image bytes and resize to the training resolution as uint8 (rounded, not truncated).
+# Shared by data preparation, the training pipeline and the app so every path feeds the model the same pixels
+def decode_resized(image_bytes):
+    image = tf.io.decode_image(image_bytes, channels=3, expand_animations=False)
+    image = tf.image.resize(image, [IMG_HEIGHT, IMG_WIDTH])
+    return tf.cast(tf.round(image), tf.uint8)
+
+def load_resized(path):
+    return decode_resized(tf.io.read_file(path))
+
+# Decode each source image once, resize to the training resolution and re-encode as JPEG
+def resize_split(split):
+    split_dir = os.path.join(source_root, split)
+    for class_name in sorted(os.listdir(split_dir)):
+        src_dir = os.path.join(split_dir, class_name)
+        if not os.path.isdir(src_dir):
+            continue
+        dst_dir = os.path.join(resized_root, split, class_name)
+        os.makedirs(dst_dir, exist_ok=True)
+        for file_name in sorted(os.listdir(src_dir)):
+            if not file_name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            image = load_resized(os.path.join(src_dir, file_name))
+            dst_path = os.path.join(dst_dir, os.path.splitext(file_name)[0] + ".jpeg")
+            tf.io.write_file(dst_path, tf.io.encode_jpeg(image, quality=95))
+        print(f"Resized {split}/{class_name}")
+
+# Pack a split of the resized copy into TFRecord shards of raw uint8 tensors (no decode at train time), so the
+# full-resolution sources are decoded only once, by resize_split(). Shuffled once so every shard mixes both
+# classes; labels follow the sorted class folder order (NORMAL -> 0, PNEUMONIA -> 1)
+def write_tfrecord_shards(split):
+    split_dir = os.path.join(resized_root, split)
+    class_names = sorted(name for name in os.listdir(split_dir) if os.path.isdir(os.path.join(split_dir, name)))
+    examples = [
+        (os.path.join(split_dir, class_name, file_name), label)
+        for label, class_name in enumerate(class_names)
+        for file_name in sorted(os.listdir(os.path.join(split_dir, class_name)))
+        if file_name.endswith(".jpeg")
+    ]
+    random.Random(42).shuffle(examples)
+
+    dst_dir = os.path.join(tfrecord_root, split)
+    os.makedirs(dst_dir, exist_ok=True)
+    for stale_shard in tf.io.gfile.glob(os.path.join(dst_dir, "*.tfrecord")):
+        os.remove(stale_shard)
+
+    images_per_shard = SHARD_BYTES // (IMG_HEIGHT * IMG_WIDTH * 3)
+    for shard_index, start in enumerate(range(0, len(examples), images_per_shard), start=1):
+        shard_path = os.path.join(dst_dir, f"shard_{shard_index:05d}.tfrecord")
+        with tf.io.TFRecordWriter(shard_path) as writer:
+            for path, label in examples[start:start + images_per_shard]:
+                example = tf.train.Example(features=tf.train.Features(feature={
+                    "image": tf.train.Feature(bytes_list=tf.train.BytesList(value=[tf.io.decode_jpeg(tf.io.read_file(path), channels=3).numpy().tobytes()])),
+                    "label": tf.train.Feature(int64_list=tf.train.Int64List(value=[label]))
+                }))
+                writer.write(example.SerializeToString())
+    print(f"Wrote {len(examples)} {split} images to {dst_dir}")
+
+if __name__ == "__main__":
+    for split in SPLITS:
+        resize_split(split)
+        write_tfrecord_shards(split)
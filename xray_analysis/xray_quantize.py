@@ -0,0 +1,137 @@
+import tensorflow as tf
+import numpy as np
+import os
+from trt_utils import source_fingerprint
+
+# Paths
+model_path = "models/pneumonia_model.keras"
+tflite_path = "models/pneumonia_int8.tflite"
+train_dir = "data/chest_xray/train"
+test_dir = "data/chest_xray/test"
+
+# Image parameters
+IMG_HEIGHT, IMG_WIDTH = 150, 150
+NUM_CALIBRATION_IMAGES = 100
+
+# Largest test-accuracy loss (absolute) at which the INT8 model is still served instead of Keras
+MAX_INT8_ACCURACY_DROP = 0.01
+
+# Models take raw 0-255 pixels and rescale internally; older models trained on [0, 1] input get the
+# Rescaling layer prepended so every serving path feeds the same input
+def with_input_rescaling(model):
+    if any(isinstance(layer, tf.keras.layers.Rescaling) for layer in model.layers):
+        return model
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=(IMG_HEIGHT, IMG_WIDTH, 3)),
+        tf.keras.layers.Rescaling(1. / 255),
+        *model.layers
+    ])
+
+# Rebuild the CNN with every layer but the output running under dtype_policy, e.g. mixed_float16
+# (FP32 weights, FP16 compute) for Tensor Cores. The output layer stays float32 so the sigmoid is full precision.
+def convert_dtype_policy(model, dtype_policy):
+    output_layer = model.layers[-1]
+
+    def clone_layer(layer):
+        config = layer.get_config()
+        if layer is not output_layer:
+            config["dtype"] = dtype_policy
+        return layer.__class__.from_config(config)
+
+    converted_model = tf.keras.models.clone_model(model, clone_function=clone_layer)
+    converted_model.set_weights(model.get_weights())
+    return converted_model
+
+# Path of the sidecar recording which .keras file a TF-Lite model was exported from
+def tflite_source_path(tflite_path):
+    return tflite_path + ".source"
+
+# Run one batch through a TF-Lite interpreter, (de)quantizing integer inputs/outputs as needed
+def run_tflite(interpreter, batch):
+    input_details = interpreter.get_input_details()[0]
+    output_details = interpreter.get_output_details()[0]
+    if input_details["dtype"] != np.float32:
+        scale, zero_point = input_details["quantization"]
+        limits = np.iinfo(input_details["dtype"])
+        batch = np.clip(np.round(batch / scale + zero_point), limits.min, limits.max)
+    interpreter.set_tensor(input_details["index"], batch.astype(input_details["dtype"]))
+    interpreter.invoke()
+    output = interpreter.get_tensor(output_details["index"])
+    if output_details["dtype"] != np.float32:
+        scale, zero_point = output_details["quantization"]
+        output = (output.astype(np.float32) - zero_point) * scale
+    return output
+
+# Binary accuracy of a TF-Lite model over (raw-pixel image, label) batches
+def tflite_accuracy(tflite_path, dataset):
+    interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=os.cpu_count())
+    interpreter.allocate_tensors()
+    correct = total = 0
+    for image, label in dataset.unbatch().batch(1):
+        output = run_tflite(interpreter, image.numpy().astype(np.float32))
+        correct += int((output[0][0] > 0.5) == (label.numpy()[0][0] > 0.5))
+        total += 1
+    return correct / total
+
+# True when the TF-Lite model was exported from the current contents of source_path
+def tflite_matches_source(tflite_path, source_path):
+    try:
+        with open(tflite_source_path(tflite_path)) as f:
+            return f.read().strip() == source_fingerprint(source_path)
+    except OSError:
+        return False
+
+# Post-training INT8 quantization; representative_images() yields float32 raw-pixel batches shaped (1, H, W, 3).
+# inference_input_type (e.g. tf.uint8) makes the model take quantized input instead of float32. Models trained
+# under mixed precision are recast to float32 first, so the full-integer conversion doesn't have to quantize
+# through FP16/BF16 casts. Any old sidecar is removed: the app serves the new file only after approve_int8_tflite()
+def export_int8_tflite(model, representative_images, output_path, inference_input_type=None):
+    if any(layer.dtype_policy.name != "float32" for layer in model.layers):
+        model = convert_dtype_policy(model, "float32")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: ([image] for image in representative_images())
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    if inference_input_type is not None:
+        converter.inference_input_type = inference_input_type
+    if os.path.exists(tflite_source_path(output_path)):
+        os.remove(tflite_source_path(output_path))
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+
+# Measure the INT8 model on the test set and tag it with source_path's fingerprint (so the app serves it) only
+# if it is within MAX_INT8_ACCURACY_DROP of the float model's reference_accuracy. Returns the INT8 accuracy
+def approve_int8_tflite(tflite_path, source_path, test_ds, reference_accuracy):
+    accuracy = tflite_accuracy(tflite_path, test_ds)
+    print(f"INT8 Test Accuracy: {accuracy:.2%} (float model: {reference_accuracy:.2%})")
+    if reference_accuracy - accuracy > MAX_INT8_ACCURACY_DROP:
+        print(f"INT8 model loses more than {MAX_INT8_ACCURACY_DROP:.0%} accuracy; the app will keep serving Keras")
+        return accuracy
+    with open(tflite_source_path(tflite_path), "w") as f:
+        f.write(source_fingerprint(source_path))
+    return accuracy
+
+if __name__ == "__main__":
+    model = with_input_rescaling(tf.keras.models.load_model(model_path))
+
+    # Raw-pixel images as fed by the app (bilinear resize, rounded like xray_prepare_data.decode_resized)
+    def image_dataset(directory, shuffle):
+        dataset = tf.keras.utils.image_dataset_from_directory(directory, image_size=(IMG_HEIGHT, IMG_WIDTH), batch_size=1, label_mode='binary', shuffle=shuffle, seed=42)
+        return dataset.map(lambda x, y: (tf.round(x), y))
+
+    # Calibrate on a shuffled sample of training images (the validation split is tiny)
+    calibration_ds = image_dataset(train_dir, shuffle=True)
+
+    def representative_images():
+        for image, _ in calibration_ds.take(NUM_CALIBRATION_IMAGES):
+            yield image
+
+    export_int8_tflite(model, representative_images, tflite_path)
+    print(f"Saved INT8 model to {tflite_path}")
+
+    test_ds = image_dataset(test_dir, shuffle=False)
+    correct = total = 0
+    for image, label in test_ds:
+        correct += int((model(image, training=False).numpy()[0][0] > 0.5) == (label.numpy()[0][0] > 0.5))
+        total += 1
+    approve_int8_tflite(tflite_path, model_path, test_ds, correct / total)